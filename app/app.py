@@ -3,30 +3,137 @@
 Media Automation System с просмотром медиафайлов
 """
 
-from flask import Flask, jsonify, request, send_from_directory, render_template_string, Response
+from flask import Flask, jsonify, request, send_from_directory, render_template_string, Response, stream_with_context
 import json
 import os
 import time
 import threading
+import atexit
+import hashlib
 import random
-from datetime import datetime
 from pathlib import Path
 import mimetypes
+import shutil
+import tempfile
+import mmap
+import gzip
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from flask.json.provider import JSONProvider
 from werkzeug.utils import secure_filename
 
+try:
+    import orjson
+except ImportError:  # orjson опционален — откат на стандартный json
+    orjson = None
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow опционален — откат на SVG-заглушку
+    Image = None
+
+
+def json_dumps_bytes(obj, pretty=False):
+    """Сериализация в bytes через orjson (или stdlib json, если его нет)"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+    return json.dumps(obj, ensure_ascii=False,
+                      indent=2 if pretty else None).encode('utf-8')
+
+
+def json_loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def iso_now():
+    """Текущая метка времени в ISO-формате без построения datetime"""
+    # strftime на C заметно дешевле datetime.now().isoformat(),
+    # а секундной точности для created_at достаточно
+    return time.strftime('%Y-%m-%dT%H:%M:%S')
+
+
+class OrjsonProvider(JSONProvider):
+    """JSON-провайдер Flask поверх orjson: jsonify идёт через C-сериализатор"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 # ==================== НАСТРОЙКИ ====================
 app = Flask(__name__)
+if orjson is not None:
+    app.json = OrjsonProvider(app)
+else:
+    # Во Flask 3 ключей JSONIFY_PRETTYPRINT_REGULAR/JSON_SORT_KEYS больше нет;
+    # у стандартного провайдера отключаем сортировку ключей и отступы напрямую
+    app.json.sort_keys = False
+    app.json.compact = True
 app.config['SECRET_KEY'] = 'media-viewer-key-2024'
 app.config['MAX_CONTENT_LENGTH'] = 100 * 1024 * 1024  # 100MB
 app.config['UPLOAD_FOLDER'] = 'data/uploads'
 app.config['OUTPUT_FOLDER'] = 'data/outputs'
 app.config['ALLOWED_EXTENSIONS'] = {'png', 'jpg', 'jpeg', 'gif', 'mp4', 'mov', 'avi', 'webm'}
+# Долгий TTL для статики: повторные загрузки галереи берут файлы из кеша
+app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 60 * 60 * 24 * 30
+
+# Отдача файлов ядром через nginx (zero-copy sendfile): включается
+# USE_X_ACCEL=1 за прокси с настроенным internal-location, см. deploy/nginx.conf
+USE_X_ACCEL = os.getenv('USE_X_ACCEL') == '1'
+
+# Предел размера медиатеки: старейшие элементы уходят в сжатый архив,
+# чтобы снимок базы и запросы не росли бесконечно
+MAX_MEDIA_ITEMS = int(os.getenv("MAX_MEDIA_ITEMS", "10000"))
+
+# Общий пул для фоновой файловой работы (заглушки, миниатюры) —
+# ограниченное число потоков вместо потока на задачу
+MEDIA_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.getenv("MEDIA_WORKERS", "4")),
+    thread_name_prefix="media")
+atexit.register(MEDIA_EXECUTOR.shutdown, wait=False)
+
+# Классификация по расширению одним хеш-поиском вместо пары линейных
+# проверок по спискам на каждую вставку
+IMAGE_EXTS = frozenset({'jpg', 'jpeg', 'png', 'gif', 'webp'})
+VIDEO_EXTS = frozenset({'mp4', 'mov', 'avi', 'webm'})
+EXT_KIND = {ext: 'image' for ext in IMAGE_EXTS}
+EXT_KIND.update({ext: 'video' for ext in VIDEO_EXTS})
+
+# Палитра и шаблон заглушки-миниатюры готовятся один раз при импорте —
+# на каждую запись остаётся только подстановка и write_bytes
+THUMB_COLORS = (b'#FF6B6B', b'#4ECDC4', b'#45B7D1', b'#96CEB4', b'#FFEAA7')
+SVG_TEMPLATE = b'''<?xml version="1.0" encoding="UTF-8"?>
+<svg width="300" height="200" xmlns="http://www.w3.org/2000/svg">
+    <rect width="300" height="200" fill="%s"/>
+    <text x="150" y="100" font-family="Arial" font-size="24"
+          fill="white" text-anchor="middle" dominant-baseline="middle">
+        Preview %d
+    </text>
+    <text x="150" y="130" font-family="Arial" font-size="14"
+          fill="white" text-anchor="middle" dominant-baseline="middle">
+        1920x1080
+    </text>
+</svg>'''
 
 # Создаем папки
 BASE_DIR = Path(__file__).parent
-for folder in ['static/images', 'static/videos', 'static/thumbnails', 
-               'data/uploads', 'data/outputs/images', 'data/outputs/videos']:
-    (BASE_DIR / folder).mkdir(parents=True, exist_ok=True)
+FOLDERS = ('static/images', 'static/videos', 'static/thumbnails',
+           'data/uploads', 'data/outputs/images', 'data/outputs/videos')
+# Часто используемые каталоги как строки: без пересборки Path-объектов
+# и __fspath__ на каждый запрос
+DATA_DIR = os.path.join(str(BASE_DIR), 'data')
+UPLOAD_DIR = os.path.join(DATA_DIR, 'uploads')
+STATIC_DIR = os.path.join(str(BASE_DIR), 'static')
+THUMB_DIR = os.path.join(STATIC_DIR, 'thumbnails')
+# os.path.isdir/os.makedirs вместо Path.mkdir — меньше работы на импорте,
+# в обычном запуске каталоги уже существуют и всё сводится к isdir
+for folder in FOLDERS:
+    path = os.path.join(str(BASE_DIR), folder)
+    if not os.path.isdir(path):
+        os.makedirs(path, exist_ok=True)
 
 # ==================== МОДЕЛЬ ДАННЫХ ====================
 
@@ -35,41 +142,164 @@ class MediaDatabase:
     
     def __init__(self):
         self.db_file = BASE_DIR / 'data' / 'media_db.json'
+        # Журнал добавлений (WAL): мутации дописываются одной строкой,
+        # полный снимок переписывается только фоновым потоком
+        self.log_file = BASE_DIR / 'data' / 'media_db.jsonl'
+        self.archive_file = BASE_DIR / 'data' / 'media_archive.jsonl.gz'
         self.media = self._load_db()
-    
+        # Индекс id -> элемент, чтобы не сканировать список на каждый запрос
+        self._by_id = {m["id"]: m for m in self.media["media"]}
+        # Поисковые строки в нижнем регистре считаются один раз при вставке,
+        # а не на каждый запрос поиска
+        self._search_blobs = {m["id"]: self._search_blob(m)
+                              for m in self.media["media"]}
+        # Каждый элемент кодируется в JSON один раз при вставке;
+        # ответ списка склеивается из готовых фрагментов.
+        # В список попадает только проекция полей, нужных карточке галереи —
+        # полный объект отдаёт /api/media/<id>
+        self._list_views = {m["id"]: self._list_view(m)
+                            for m in self.media["media"]}
+        self._encoded = {m["id"]: json_dumps_bytes(self._list_views[m["id"]])
+                         for m in self.media["media"]}
+        # Номер версии растёт на каждой мутации — основа для ETag в API.
+        # Приставка уникальна для каждого запуска: без неё счётчик после
+        # рестарта повторял бы старые значения и клиенты получали бы
+        # ложные 304 с устаревшей галереей
+        self.etag_seed = f"{time.time_ns():x}"
+        self.version = 0
+        # Кеш сериализованного полного списка; сбрасывается при мутации
+        self._all_bytes = None
+        self._all_bytes_gz = None
+        # Кеши отфильтрованных списков и результатов поиска —
+        # повторные обращения не сканируют медиатеку заново
+        self._all_cache = {}
+        self._search_cache = {}
+        # Счётчики по типам — статистика без обхода всего списка
+        self._type_counts = {}
+        for m in self.media["media"]:
+            self._type_counts[m["type"]] = self._type_counts.get(m["type"], 0) + 1
+        self._log_fh = open(self.log_file, 'ab')
+        # Один RLock на всё состояние: пишут запросы и фоновый флашер
+        self._lock = threading.RLock()
+        # Отложенная запись: мутации только помечают базу "грязной",
+        # фоновый поток сбрасывает её на диск не чаще, чем раз в _flush_interval
+        self._dirty = threading.Event()
+        self._flush_interval = 0.5
+        threading.Thread(target=self._flush_loop, daemon=True).start()
+        atexit.register(self.flush)
+
     def _load_db(self):
+        data = {"media": [], "next_id": 1}
         if self.db_file.exists():
             try:
-                with open(self.db_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                data = self._parse_snapshot()
             except:
-                return {"media": [], "next_id": 1}
-        return {"media": [], "next_id": 1}
+                data = {"media": [], "next_id": 1}
+        self._replay_log(data)
+        return data
+
+    def _parse_snapshot(self):
+        """Разбор снимка; большие файлы читаются через mmap без копии"""
+        # для мелких файлов накладные расходы mmap не окупаются
+        if self.db_file.stat().st_size < (1 << 20):
+            return json_loads(self.db_file.read_bytes())
+        with open(self.db_file, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if orjson is not None:
+                    return orjson.loads(memoryview(mm))
+                return json.loads(mm[:])
+
+    def _replay_log(self, data):
+        """Дочитать из журнала записи, не попавшие в последний снимок"""
+        if not self.log_file.exists():
+            return
+        known = {m["id"] for m in data["media"]}
+        try:
+            with open(self.log_file, 'rb') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    record = json_loads(line)
+                    item = record.get("item")
+                    if record.get("op") == "add" and item and item["id"] not in known:
+                        data["media"].append(item)
+                        known.add(item["id"])
+                        data["next_id"] = max(data["next_id"], item["id"] + 1)
+        except:
+            pass
     
     def _save_db(self):
-        with open(self.db_file, 'w', encoding='utf-8') as f:
-            json.dump(self.media, f, ensure_ascii=False, indent=2)
-    
-    def add_media(self, filename, media_type, description=""):
-        """Добавление медиафайла в базу"""
-        media_id = self.media["next_id"]
-        
+        # Атомарная запись: сначала во временный файл, потом os.replace,
+        # чтобы падение посреди записи не портило базу
+        tmp_file = self.db_file.with_suffix('.json.tmp')
+        # Снимок — служебный файл: пишем компактно, без генерации отступов
+        with open(tmp_file, 'wb') as f:
+            f.write(json_dumps_bytes(self.media))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.db_file)
+        # fsync каталога закрепляет переименование на диске
+        dir_fd = os.open(self.db_file.parent, os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+        # Снимок содержит всё — журнал можно обнулить
+        self._log_fh.truncate(0)
+
+    def _append_log(self, media_item):
+        """Дописать добавленный элемент одной строкой в журнал
+
+        Буферизуется до _flush_log — пакетная вставка делает один write
+        на всю пачку вместо записи на каждый элемент.
+        """
+        self._log_fh.write(json_dumps_bytes({"op": "add", "item": media_item}) + b'\n')
+
+    def _flush_log(self):
+        self._log_fh.flush()
+
+    def _mark_dirty(self):
+        """Пометить базу изменённой — запись выполнит фоновый поток"""
+        self._dirty.set()
+
+    def _flush_loop(self):
+        while True:
+            self._dirty.wait()
+            time.sleep(self._flush_interval)
+            with self._lock:
+                self._dirty.clear()
+                try:
+                    self._save_db()
+                except Exception:
+                    # Разовый сбой записи (нет места, права) не должен
+                    # убивать флашер: флаг ставим обратно и пробуем
+                    # на следующем круге
+                    self._dirty.set()
+
+    def flush(self):
+        """Синхронный сброс несохранённых изменений (выход из процесса)"""
+        with self._lock:
+            if self._dirty.is_set():
+                self._dirty.clear()
+                self._save_db()
+
+    def _build_item(self, media_id, filename, media_type, description, created=None):
+        """Сборка словаря медиафайла (без записи в базу)"""
         # Определяем тип файла
-        ext = filename.split('.')[-1].lower()
-        if ext in ['jpg', 'jpeg', 'png', 'gif', 'webp']:
-            file_type = 'image'
+        ext = filename.rpartition('.')[2].lower()
+        file_type = EXT_KIND.get(ext, 'document')
+        if file_type == 'image':
             thumbnail = f'/static/thumbnails/{media_id}.jpg'
             preview_url = f'/media/preview/{media_id}'
-        elif ext in ['mp4', 'mov', 'avi', 'webm']:
-            file_type = 'video'
+        elif file_type == 'video':
             thumbnail = f'/static/thumbnails/{media_id}.jpg'
             preview_url = f'/media/player/{media_id}'
         else:
-            file_type = 'document'
             thumbnail = None
             preview_url = None
-        
-        media_item = {
+
+        return {
             "id": media_id,
             "filename": filename,
             "type": file_type,
@@ -78,839 +308,335 @@ class MediaDatabase:
             "path": f"/data/uploads/{filename}",
             "thumbnail": thumbnail,
             "preview_url": preview_url,
-            "created_at": datetime.now().isoformat(),
+            "created_at": created or iso_now(),
             "size": "1920x1080",
             "status": "active"
         }
-        
+
+    # Поля, которые не нужны карточке в списке — их не шлём в галерею
+    _LIST_DROP = frozenset({'path', 'preview_url', 'status'})
+
+    @staticmethod
+    def _list_view(media_item):
+        return {k: v for k, v in media_item.items()
+                if k not in MediaDatabase._LIST_DROP}
+
+    @staticmethod
+    def _search_blob(media_item):
+        return f"{media_item['filename']}\x00{media_item['description']}".lower()
+
+    def _insert_item(self, media_item):
+        """Вставка готового элемента (вызывать под блокировкой)"""
         self.media["media"].append(media_item)
+        self._by_id[media_item["id"]] = media_item
+        self._search_blobs[media_item["id"]] = self._search_blob(media_item)
+        view = self._list_view(media_item)
+        self._list_views[media_item["id"]] = view
+        self._encoded[media_item["id"]] = json_dumps_bytes(view)
+        self._type_counts[media_item["type"]] = \
+            self._type_counts.get(media_item["type"], 0) + 1
         self.media["next_id"] += 1
-        self._save_db()
-        
-        # Создаем тестовую миниатюру
+        self.version += 1
+        self._all_bytes = None
+        self._all_bytes_gz = None
+        self._all_cache.clear()
+        self._search_cache.clear()
+        self._append_log(media_item)
+        self._evict_overflow()
+
+    def _evict_overflow(self):
+        """Сброс старейших элементов в архив при превышении лимита"""
+        evicted = []
+        while len(self.media["media"]) > MAX_MEDIA_ITEMS:
+            oldest = self.media["media"].pop(0)
+            self._by_id.pop(oldest["id"], None)
+            self._search_blobs.pop(oldest["id"], None)
+            self._list_views.pop(oldest["id"], None)
+            self._encoded.pop(oldest["id"], None)
+            self._type_counts[oldest["type"]] = \
+                self._type_counts.get(oldest["type"], 1) - 1
+            evicted.append(oldest)
+        if evicted:
+            with gzip.open(self.archive_file, 'ab') as gz:
+                gz.write(b''.join(json_dumps_bytes(i) + b'\n' for i in evicted))
+
+    def add_media(self, filename, media_type, description=""):
+        """Добавление медиафайла в базу"""
+        with self._lock:
+            media_id = self.media["next_id"]
+            media_item = self._build_item(media_id, filename, media_type, description)
+            self._insert_item(media_item)
+            self._flush_log()
+            self._mark_dirty()
+
+        # Создаем тестовую миниатюру (вне критической секции)
         self._create_test_thumbnail(media_id)
-        
+
         return media_item
+
+    def add_media_many(self, entries):
+        """Пакетное добавление: одна блокировка и одна отметка на всю пачку
+
+        entries — список кортежей (filename, media_type, description).
+        """
+        added = []
+        # Одна временная метка на всю пачку — не дёргаем clock_gettime в цикле
+        now = iso_now()
+        with self._lock:
+            for filename, media_type, description in entries:
+                media_id = self.media["next_id"]
+                media_item = self._build_item(media_id, filename, media_type,
+                                              description, created=now)
+                self._insert_item(media_item)
+                added.append(media_item)
+            # Один сброс журнала на всю пачку
+            self._flush_log()
+            self._mark_dirty()
+
+        for item in added:
+            self._create_test_thumbnail(item["id"])
+
+        return added
     
     def _create_test_thumbnail(self, media_id):
         """Создание тестовой миниатюры (заглушка)"""
-        import random
-        colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7']
-        color = random.choice(colors)
-        
         # В реальном приложении здесь будет генерация реальной миниатюры
-        thumb_path = BASE_DIR / 'static' / 'thumbnails' / f'{media_id}.jpg'
-        
-        # Создаем простой SVG как заглушку
-        svg_content = f'''<?xml version="1.0" encoding="UTF-8"?>
-        <svg width="300" height="200" xmlns="http://www.w3.org/2000/svg">
-            <rect width="300" height="200" fill="{color}"/>
-            <text x="150" y="100" font-family="Arial" font-size="24" 
-                  fill="white" text-anchor="middle" dominant-baseline="middle">
-                Preview {media_id}
-            </text>
-            <text x="150" y="130" font-family="Arial" font-size="14" 
-                  fill="white" text-anchor="middle" dominant-baseline="middle">
-                1920x1080
-            </text>
-        </svg>'''
-        
-        with open(thumb_path, 'w', encoding='utf-8') as f:
-            f.write(svg_content)
+        thumb_path = os.path.join(THUMB_DIR, f'{media_id}.jpg')
+        color = random.choice(THUMB_COLORS)
+        if Image is not None:
+            # Настоящий JPEG: браузер не растеризует SVG на каждую отрисовку
+            Image.new('RGB', (300, 200), color.decode()).save(
+                thumb_path, 'JPEG', quality=75, optimize=True)
+        else:
+            with open(thumb_path, 'wb') as f:
+                f.write(SVG_TEMPLATE % (color, media_id))
     
     def get_media(self, media_id):
         """Получение медиафайла по ID"""
-        for item in self.media["media"]:
-            if item["id"] == media_id:
-                return item
-        return None
-    
-    def get_all_media(self, media_type=None):
-        """Получение всех медиафайлов"""
-        if media_type:
-            return [m for m in self.media["media"] if m["type"] == media_type]
-        return self.media["media"]
+        return self._by_id.get(media_id)
     
+    def get_all_media(self, media_type=None, limit=None):
+        """Получение всех медиафайлов
+
+        Список хранится в порядке создания, поэтому последние limit
+        элементов берутся срезом без сортировки.
+        """
+        with self._lock:
+            items = self.media["media"]
+            if media_type:
+                cached = self._all_cache.get(media_type)
+                if cached is None:
+                    cached = [m for m in items if m["type"] == media_type]
+                    self._all_cache[media_type] = cached
+                items = cached
+            if limit:
+                return list(reversed(items[-limit:]))
+            return items
+
+    def get_list_view(self, media_type=None, limit=None):
+        """Список проекций для галереи — без лишних полей в ответе"""
+        with self._lock:
+            views = self._list_views
+            return [views[m["id"]]
+                    for m in self.get_all_media(media_type, limit)]
+
+    def get_all_bytes(self):
+        """Готовые JSON-байты полного списка — склейка фрагментов без перекодирования"""
+        with self._lock:
+            if self._all_bytes is None:
+                encoded = self._encoded
+                self._all_bytes = b'[' + b','.join(
+                    encoded[m["id"]] for m in self.media["media"]) + b']'
+            return self._all_bytes
+
+    def get_all_bytes_gz(self):
+        """Сжатая копия полного списка — gzip один раз на версию, не на запрос"""
+        with self._lock:
+            if self._all_bytes_gz is None:
+                self._all_bytes_gz = gzip.compress(self.get_all_bytes(), 1)
+            return self._all_bytes_gz
+
+    def get_stats(self):
+        """Счётчики медиатеки — O(1), без сканирования списка"""
+        with self._lock:
+            return {
+                "total": len(self.media["media"]),
+                "by_type": dict(self._type_counts)
+            }
+
     def search_media(self, query):
         """Поиск медиафайлов"""
-        results = []
         query = query.lower()
-        for item in self.media["media"]:
-            if (query in item["description"].lower() or 
-                query in item["filename"].lower()):
-                results.append(item)
+        with self._lock:
+            results = self._search_cache.get(query)
+            if results is not None:
+                return results
+            blobs = self._search_blobs
+            results = [item for item in self.media["media"]
+                       if query in blobs[item["id"]]]
+            # Простое ограничение размера кеша: вытесняем старейший запрос
+            if len(self._search_cache) >= 128:
+                self._search_cache.pop(next(iter(self._search_cache)))
+            self._search_cache[query] = results
         return results
 
+    def search_bytes(self, query):
+        """Готовые JSON-байты результата поиска из кешированных фрагментов"""
+        with self._lock:
+            results = self.search_media(query)
+            encoded = self._encoded
+            return b'[' + b','.join(encoded[m["id"]] for m in results) + b']'
+
 # Инициализация базы данных
 db = MediaDatabase()
 
 # ==================== HTML ИНТЕРФЕЙС ====================
 
-HTML_TEMPLATE = '''
-<!DOCTYPE html>
-<html lang="ru">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Media Automation - Просмотр медиа</title>
-    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css" rel="stylesheet">
-    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css">
-    <style>
-        :root {
-            --primary: #4361ee;
-            --secondary: #3a0ca3;
-            --success: #4cc9f0;
-        }
-        body {
-            background: #f8f9fa;
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-        }
-        .navbar {
-            background: linear-gradient(90deg, var(--primary) 0%, var(--secondary) 100%);
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }
-        .media-card {
-            border: none;
-            border-radius: 12px;
-            overflow: hidden;
-            box-shadow: 0 4px 15px rgba(0,0,0,0.08);
-            transition: all 0.3s ease;
-            height: 100%;
-        }
-        .media-card:hover {
-            transform: translateY(-8px);
-            box-shadow: 0 8px 25px rgba(0,0,0,0.15);
-        }
-        .media-thumbnail {
-            width: 100%;
-            height: 200px;
-            object-fit: cover;
-            background: linear-gradient(45deg, #667eea, #764ba2);
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            color: white;
-            font-size: 24px;
-        }
-        .media-icon {
-            font-size: 48px;
-            opacity: 0.8;
-        }
-        .media-badge {
-            position: absolute;
-            top: 10px;
-            right: 10px;
-            z-index: 2;
-        }
-        .media-actions {
-            position: absolute;
-            bottom: 10px;
-            right: 10px;
-            opacity: 0;
-            transition: opacity 0.3s;
-        }
-        .media-card:hover .media-actions {
-            opacity: 1;
-        }
-        .modal-fullscreen {
-            max-width: 95vw;
-            max-height: 95vh;
-        }
-        .modal-content {
-            border-radius: 15px;
-            overflow: hidden;
-        }
-        .media-preview {
-            max-width: 100%;
-            max-height: 70vh;
-            object-fit: contain;
-        }
-        .tab-content {
-            padding: 20px 0;
-        }
-        .upload-area {
-            border: 3px dashed #dee2e6;
-            border-radius: 15px;
-            padding: 40px;
-            text-align: center;
-            cursor: pointer;
-            transition: all 0.3s;
-        }
-        .upload-area:hover {
-            border-color: var(--primary);
-            background-color: rgba(67, 97, 238, 0.05);
-        }
-        .upload-icon {
-            font-size: 48px;
-            color: #6c757d;
-            margin-bottom: 20px;
-        }
-    </style>
-</head>
-<body>
-    <!-- Навигация -->
-    <nav class="navbar navbar-expand-lg navbar-dark">
-        <div class="container">
-            <a class="navbar-brand" href="/">
-                <i class="fas fa-photo-video me-2"></i>
-                <strong>Media Automation</strong>
-            </a>
-            <button class="navbar-toggler" type="button" data-bs-toggle="collapse" data-bs-target="#navbarNav">
-                <span class="navbar-toggler-icon"></span>
-            </button>
-            <div class="collapse navbar-collapse" id="navbarNav">
-                <ul class="navbar-nav me-auto">
-                    <li class="nav-item">
-                        <a class="nav-link active" href="#" onclick="showTab('gallery')">
-                            <i class="fas fa-th-large me-1"></i> Галерея
-                        </a>
-                    </li>
-                    <li class="nav-item">
-                        <a class="nav-link" href="#" onclick="showTab('upload')">
-                            <i class="fas fa-upload me-1"></i> Загрузить
-                        </a>
-                    </li>
-                    <li class="nav-item">
-                        <a class="nav-link" href="#" onclick="showTab('generate')">
-                            <i class="fas fa-robot me-1"></i> Сгенерировать
-                        </a>
-                    </li>
-                </ul>
-                <div class="navbar-text text-white">
-                    <i class="fas fa-database me-1"></i>
-                    <span id="mediaCount">0</span> файлов
-                </div>
-            </div>
-        </div>
-    </nav>
-
-    <!-- Основной контент -->
-    <div class="container mt-4">
-        <!-- Табы -->
-        <div class="mb-4">
-            <ul class="nav nav-tabs" id="mediaTabs">
-                <li class="nav-item">
-                    <button class="nav-link active" onclick="showTab('gallery')">
-                        <i class="fas fa-th-large me-2"></i>Галерея медиа
-                    </button>
-                </li>
-                <li class="nav-item">
-                    <button class="nav-link" onclick="showTab('upload')">
-                        <i class="fas fa-upload me-2"></i>Загрузка файлов
-                    </button>
-                </li>
-                <li class="nav-item">
-                    <button class="nav-link" onclick="showTab('generate')">
-                        <i class="fas fa-magic me-2"></i>Генерация контента
-                    </button>
-                </li>
-            </ul>
-        </div>
-
-        <!-- Вкладка галереи -->
-        <div id="galleryTab" class="tab-content">
-            <div class="row mb-4">
-                <div class="col-md-6">
-                    <h3><i class="fas fa-images me-2"></i>Медиатека</h3>
-                </div>
-                <div class="col-md-6">
-                    <div class="input-group">
-                        <input type="text" class="form-control" id="searchMedia" 
-                               placeholder="Поиск по названию или описанию...">
-                        <button class="btn btn-primary" onclick="searchMedia()">
-                            <i class="fas fa-search"></i>
-                        </button>
-                    </div>
-                </div>
-            </div>
-
-            <div class="row">
-                <div class="col-md-3 mb-3">
-                    <div class="card media-card">
-                        <div class="card-body text-center">
-                            <div class="upload-icon">
-                                <i class="fas fa-plus-circle"></i>
-                            </div>
-                            <h5>Новый контент</h5>
-                            <p class="text-muted small">Добавить медиафайлы</p>
-                            <button class="btn btn-primary btn-sm" onclick="showTab('upload')">
-                                <i class="fas fa-plus me-1"></i>Добавить
-                            </button>
-                        </div>
-                    </div>
-                </div>
-
-                <!-- Сюда будут добавляться карточки медиа -->
-                <div id="mediaGallery" class="row">
-                    <!-- Карточки загружаются через JavaScript -->
-                </div>
-            </div>
-        </div>
-
-        <!-- Вкладка загрузки -->
-        <div id="uploadTab" class="tab-content" style="display: none;">
-            <div class="row justify-content-center">
-                <div class="col-md-8">
-                    <div class="card">
-                        <div class="card-header bg-primary text-white">
-                            <h4 class="mb-0"><i class="fas fa-cloud-upload-alt me-2"></i>Загрузка медиафайлов</h4>
-                        </div>
-                        <div class="card-body">
-                            <div class="upload-area" onclick="document.getElementById('fileInput').click()">
-                                <div class="upload-icon">
-                                    <i class="fas fa-cloud-upload-alt"></i>
-                                </div>
-                                <h4>Перетащите файлы сюда</h4>
-                                <p class="text-muted">или нажмите для выбора файлов</p>
-                                <p class="small text-muted">Поддерживаются: JPG, PNG, GIF, MP4, MOV</p>
-                            </div>
-                            
-                            <input type="file" id="fileInput" multiple style="display: none;" 
-                                   onchange="handleFileSelect(this.files)">
-                            
-                            <div class="mt-4">
-                                <label class="form-label">Описание (опционально):</label>
-                                <textarea class="form-control" id="fileDescription" rows="3" 
-                                          placeholder="Опишите, что на изображении/видео..."></textarea>
-                            </div>
-                            
-                            <div class="mt-4">
-                                <label class="form-label">Тип контента:</label>
-                                <select class="form-select" id="mediaType">
-                                    <option value="reference">Пример (для обучения ИИ)</option>
-                                    <option value="generated">Сгенерированный контент</option>
-                                    <option value="upscaled">Апскейлированное</option>
-                                    <option value="final">Финальный результат</option>
-                                </select>
-                            </div>
-                            
-                            <div class="d-grid gap-2 mt-4">
-                                <button class="btn btn-success btn-lg" onclick="uploadFiles()">
-                                    <i class="fas fa-upload me-2"></i>Загрузить выбранные файлы
-                                </button>
-                            </div>
-                            
-                            <div id="uploadProgress" class="mt-4" style="display: none;">
-                                <div class="progress">
-                                    <div class="progress-bar progress-bar-striped progress-bar-animated" 
-                                         role="progressbar" style="width: 0%"></div>
-                                </div>
-                                <div class="text-center mt-2" id="uploadStatus"></div>
-                            </div>
-                            
-                            <div id="selectedFiles" class="mt-4"></div>
-                        </div>
-                    </div>
-                </div>
-            </div>
-        </div>
-
-        <!-- Вкладка генерации -->
-        <div id="generateTab" class="tab-content" style="display: none;">
-            <div class="row justify-content-center">
-                <div class="col-md-8">
-                    <div class="card">
-                        <div class="card-header bg-success text-white">
-                            <h4 class="mb-0"><i class="fas fa-robot me-2"></i>Генерация контента</h4>
-                        </div>
-                        <div class="card-body">
-                            <div class="mb-4">
-                                <label class="form-label">Описание для генерации:</label>
-                                <textarea class="form-control" id="generatePrompt" rows="4"
-                                          placeholder="Опишите, что вы хотите сгенерировать. Например: 'Космический пейзаж с планетами в стиле научной фантастики'"></textarea>
-                            </div>
-                            
-                            <div class="row mb-4">
-                                <div class="col-md-6">
-                                    <label class="form-label">Тип контента:</label>
-                                    <select class="form-select" id="generateType">
-                                        <option value="image">Изображение</option>
-                                        <option value="video">Видео</option>
-                                    </select>
-                                </div>
-                                <div class="col-md-6">
-                                    <label class="form-label">Количество вариантов:</label>
-                                    <select class="form-select" id="generateCount">
-                                        <option value="1">1 вариант</option>
-                                        <option value="2">2 варианта</option>
-                                        <option value="4" selected>4 варианта</option>
-                                        <option value="8">8 вариантов</option>
-                                    </select>
-                                </div>
-                            </div>
-                            
-                            <div class="d-grid gap-2">
-                                <button class="btn btn-success btn-lg" onclick="generateContent()">
-                                    <i class="fas fa-magic me-2"></i>Сгенерировать контент
-                                </button>
-                            </div>
-                            
-                            <div id="generateProgress" class="mt-4" style="display: none;">
-                                <div class="progress">
-                                    <div class="progress-bar progress-bar-striped progress-bar-animated bg-success" 
-                                         role="progressbar" style="width: 0%"></div>
-                                </div>
-                                <div class="text-center mt-2" id="generateStatus"></div>
-                            </div>
-                        </div>
-                    </div>
-                </div>
-            </div>
-        </div>
-    </div>
-
-    <!-- Модальное окно для просмотра -->
-    <div class="modal fade" id="mediaModal" tabindex="-1" aria-hidden="true">
-        <div class="modal-dialog modal-xl modal-fullscreen">
-            <div class="modal-content">
-                <div class="modal-header">
-                    <h5 class="modal-title" id="mediaModalTitle">Просмотр медиа</h5>
-                    <button type="button" class="btn-close" data-bs-dismiss="modal"></button>
-                </div>
-                <div class="modal-body text-center">
-                    <div id="mediaPreviewContainer">
-                        <!-- Здесь будет отображаться медиафайл -->
-                    </div>
-                </div>
-                <div class="modal-footer">
-                    <button class="btn btn-primary" onclick="downloadMedia()">
-                        <i class="fas fa-download me-2"></i>Скачать
-                    </button>
-                    <button class="btn btn-outline-secondary" data-bs-dismiss="modal">
-                        Закрыть
-                    </button>
-                </div>
-            </div>
-        </div>
-    </div>
-
-    <!-- JavaScript -->
-    <script src="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js"></script>
-    <script>
-    // Глобальные переменные
-    let selectedFiles = [];
-    let currentMediaId = null;
-    
-    // Функции для вкладок
-    function showTab(tabName) {
-        // Скрыть все вкладки
-        document.getElementById('galleryTab').style.display = 'none';
-        document.getElementById('uploadTab').style.display = 'none';
-        document.getElementById('generateTab').style.display = 'none';
-        
-        // Показать выбранную вкладку
-        document.getElementById(tabName + 'Tab').style.display = 'block';
-        
-        // Обновить активный таб в навигации
-        document.querySelectorAll('.nav-tabs .nav-link').forEach(link => {
-            link.classList.remove('active');
-        });
-        event.target.classList.add('active');
-        
-        // Если это галерея - загрузить медиа
-        if (tabName === 'gallery') {
-            loadMediaGallery();
-        }
-    }
-    
-    // Загрузка галереи медиа
-    function loadMediaGallery() {
-        fetch('/api/media')
-            .then(response => response.json())
-            .then(media => {
-                updateMediaCount(media.length);
-                renderMediaGallery(media);
-            })
-            .catch(error => {
-                console.error('Ошибка загрузки медиа:', error);
-                document.getElementById('mediaGallery').innerHTML = 
-                    '<div class="col-12 text-center"><p class="text-danger">Ошибка загрузки медиа</p></div>';
-            });
-    }
-    
-    // Обновление счетчика медиа
-    function updateMediaCount(count) {
-        document.getElementById('mediaCount').textContent = count;
-    }
-    
-    // Отрисовка галереи
-    function renderMediaGallery(media) {
-        const container = document.getElementById('mediaGallery');
-        
-        if (!media || media.length === 0) {
-            container.innerHTML = `
-                <div class="col-12 text-center py-5">
-                    <i class="fas fa-inbox fa-3x text-muted mb-3"></i>
-                    <h4 class="text-muted">Медиатека пуста</h4>
-                    <p class="text-muted mb-4">Загрузите или сгенерируйте первый файл</p>
-                    <button class="btn btn-primary" onclick="showTab('upload')">
-                        <i class="fas fa-upload me-2"></i>Загрузить файлы
-                    </button>
-                    <button class="btn btn-success ms-2" onclick="showTab('generate')">
-                        <i class="fas fa-magic me-2"></i>Сгенерировать
-                    </button>
-                </div>
-            `;
-            return;
-        }
-        
-        let html = '';
-        media.forEach(item => {
-            // Определяем иконку по типу
-            let icon = 'fa-file';
-            let badgeClass = 'bg-secondary';
-            
-            if (item.type === 'image') {
-                icon = 'fa-image';
-                badgeClass = 'bg-success';
-            } else if (item.type === 'video') {
-                icon = 'fa-video';
-                badgeClass = 'bg-primary';
-            }
-            
-            // Определяем цвет бейджа по типу контента
-            let typeBadgeClass = 'bg-info';
-            if (item.media_type === 'reference') typeBadgeClass = 'bg-warning';
-            else if (item.media_type === 'generated') typeBadgeClass = 'bg-success';
-            else if (item.media_type === 'upscaled') typeBadgeClass = 'bg-purple';
-            else if (item.media_type === 'final') typeBadgeClass = 'bg-danger';
-            
-            html += `
-                <div class="col-md-3 mb-4">
-                    <div class="card media-card" data-media-id="${item.id}">
-                        <!-- Миниатюра -->
-                        <div class="media-thumbnail position-relative">
-                            ${item.thumbnail ? 
-                                `<img src="${item.thumbnail}" class="w-100 h-100" style="object-fit: cover;">` :
-                                `<i class="fas ${icon} media-icon"></i>`
-                            }
-                            
-                            <!-- Бейдж типа -->
-                            <span class="badge ${typeBadgeClass} media-badge">
-                                ${item.media_type === 'reference' ? 'Пример' : 
-                                  item.media_type === 'generated' ? 'Сген.' :
-                                  item.media_type === 'upscaled' ? 'Апск.' : 'Финальный'}
-                            </span>
-                            
-                            <!-- Действия -->
-                            <div class="media-actions">
-                                <button class="btn btn-sm btn-light" onclick="viewMedia(${item.id})" title="Просмотр">
-                                    <i class="fas fa-eye"></i>
-                                </button>
-                                <button class="btn btn-sm btn-light ms-1" onclick="downloadMedia(${item.id})" title="Скачать">
-                                    <i class="fas fa-download"></i>
-                                </button>
-                            </div>
-                        </div>
-                        
-                        <!-- Информация -->
-                        <div class="card-body">
-                            <h6 class="card-title text-truncate" title="${item.filename}">
-                                <i class="fas ${icon} me-2 text-${item.type === 'image' ? 'success' : 'primary'}"></i>
-                                ${item.filename}
-                            </h6>
-                            <p class="card-text small text-muted mb-2">
-                                ${item.description || 'Без описания'}
-                            </p>
-                            <div class="d-flex justify-content-between align-items-center">
-                                <small class="text-muted">
-                                    ${item.size || '1920x1080'}
-                                </small>
-                                <small class="text-muted">
-                                    ${new Date(item.created_at).toLocaleDateString('ru-RU')}
-                                </small>
-                            </div>
-                        </div>
-                    </div>
-                </div>
-            `;
-        });
-        
-        container.innerHTML = html;
-    }
-    
-    // Просмотр медиафайла
-    function viewMedia(mediaId) {
-        currentMediaId = mediaId;
-        
-        fetch(`/api/media/${mediaId}`)
-            .then(response => response.json())
-            .then(media => {
-                const modal = new bootstrap.Modal(document.getElementById('mediaModal'));
-                const container = document.getElementById('mediaPreviewContainer');
-                
-                document.getElementById('mediaModalTitle').textContent = media.filename;
-                
-                if (media.type === 'image') {
-                    // Для изображений
-                    container.innerHTML = `
-                        <img src="${media.path}" class="media-preview" alt="${media.filename}">
-                        <div class="mt-3">
-                            <p class="mb-2"><strong>Описание:</strong> ${media.description || 'Нет описания'}</p>
-                            <p class="mb-2"><strong>Размер:</strong> ${media.size || 'Неизвестно'}</p>
-                            <p class="mb-0"><strong>Тип:</strong> ${media.media_type === 'reference' ? 'Пример' : 'Сгенерированное'}</p>
-                        </div>
-                    `;
-                } else if (media.type === 'video') {
-                    // Для видео
-                    container.innerHTML = `
-                        <video controls class="media-preview">
-                            <source src="${media.path}" type="video/mp4">
-                            Ваш браузер не поддерживает видео.
-                        </video>
-                        <div class="mt-3">
-                            <p class="mb-2"><strong>Описание:</strong> ${media.description || 'Нет описания'}</p>
-                            <p class="mb-2"><strong>Размер:</strong> ${media.size || 'Неизвестно'}</p>
-                            <p class="mb-0"><strong>Тип:</strong> ${media.media_type === 'reference' ? 'Пример' : 'Сгенерированное'}</p>
-                        </div>
-                    `;
-                }
-                
-                modal.show();
-            })
-            .catch(error => {
-                alert('Ошибка загрузки медиафайла: ' + error);
-            });
-    }
-    
-    // Поиск медиа
-    function searchMedia() {
-        const query = document.getElementById('searchMedia').value;
-        if (!query.trim()) {
-            loadMediaGallery();
-            return;
-        }
-        
-        fetch(`/api/media/search?q=${encodeURIComponent(query)}`)
-            .then(response => response.json())
-            .then(media => {
-                renderMediaGallery(media);
-            });
-    }
-    
-    // Обработка выбора файлов
-    function handleFileSelect(files) {
-        selectedFiles = Array.from(files);
-        const container = document.getElementById('selectedFiles');
-        
-        if (selectedFiles.length === 0) {
-            container.innerHTML = '';
-            return;
-        }
-        
-        let html = '<h5>Выбранные файлы:</h5><div class="list-group">';
-        selectedFiles.forEach((file, index) => {
-            html += `
-                <div class="list-group-item">
-                    <div class="d-flex justify-content-between align-items-center">
-                        <div>
-                            <i class="fas ${file.type.startsWith('image') ? 'fa-image text-success' : 
-                                          file.type.startsWith('video') ? 'fa-video text-primary' : 'fa-file'} me-2"></i>
-                            ${file.name} (${(file.size / 1024 / 1024).toFixed(2)} MB)
-                        </div>
-                        <button class="btn btn-sm btn-danger" onclick="removeFile(${index})">
-                            <i class="fas fa-times"></i>
-                        </button>
-                    </div>
-                </div>
-            `;
-        });
-        html += '</div>';
-        
-        container.innerHTML = html;
-    }
-    
-    // Удаление файла из списка
-    function removeFile(index) {
-        selectedFiles.splice(index, 1);
-        handleFileSelect(selectedFiles);
-    }
-    
-    // Загрузка файлов на сервер
-    function uploadFiles() {
-        if (selectedFiles.length === 0) {
-            alert('Выберите файлы для загрузки');
-            return;
-        }
-        
-        const description = document.getElementById('fileDescription').value;
-        const mediaType = document.getElementById('mediaType').value;
-        
-        document.getElementById('uploadProgress').style.display = 'block';
-        document.getElementById('uploadStatus').textContent = 'Начинаю загрузку...';
-        
-        let uploadedCount = 0;
-        const totalFiles = selectedFiles.length;
-        
-        selectedFiles.forEach(file => {
-            const formData = new FormData();
-            formData.append('file', file);
-            formData.append('description', description);
-            formData.append('media_type', mediaType);
-            
-            fetch('/api/media/upload', {
-                method: 'POST',
-                body: formData
-            })
-            .then(response => response.json())
-            .then(data => {
-                uploadedCount++;
-                const progress = Math.round((uploadedCount / totalFiles) * 100);
-                
-                document.querySelector('#uploadProgress .progress-bar').style.width = progress + '%';
-                document.getElementById('uploadStatus').textContent = 
-                    `Загружено ${uploadedCount} из ${totalFiles} файлов`;
-                
-                if (uploadedCount === totalFiles) {
-                    document.getElementById('uploadStatus').innerHTML = 
-                        '<span class="text-success">✅ Все файлы загружены!</span>';
-                    
-                    // Очистить форму
-                    selectedFiles = [];
-                    document.getElementById('selectedFiles').innerHTML = '';
-                    document.getElementById('fileDescription').value = '';
-                    
-                    // Показать галерею
-                    setTimeout(() => {
-                        showTab('gallery');
-                    }, 2000);
-                }
-            })
-            .catch(error => {
-                console.error('Ошибка загрузки:', error);
-                document.getElementById('uploadStatus').innerHTML = 
-                    `<span class="text-danger">❌ Ошибка загрузки файла ${file.name}</span>`;
-            });
-        });
-    }
-    
-    // Генерация контента
-    function generateContent() {
-        const prompt = document.getElementById('generatePrompt').value;
-        const type = document.getElementById('generateType').value;
-        const count = document.getElementById('generateCount').value;
-        
-        if (!prompt.trim()) {
-            alert('Введите описание для генерации');
-            return;
-        }
-        
-        document.getElementById('generateProgress').style.display = 'block';
-        document.getElementById('generateStatus').textContent = 'Начинаю генерацию...';
-        
-        fetch('/api/media/generate', {
-            method: 'POST',
-            headers: {'Content-Type': 'application/json'},
-            body: JSON.stringify({
-                prompt: prompt,
-                type: type,
-                count: parseInt(count)
-            })
-        })
-        .then(response => response.json())
-        .then(data => {
-            if (data.success) {
-                // Симуляция прогресса генерации
-                let progress = 0;
-                const interval = setInterval(() => {
-                    progress += 10;
-                    document.querySelector('#generateProgress .progress-bar').style.width = progress + '%';
-                    document.getElementById('generateStatus').textContent = 
-                        `Генерация... ${progress}%`;
-                    
-                    if (progress >= 100) {
-                        clearInterval(interval);
-                        document.getElementById('generateStatus').innerHTML = 
-                            '<span class="text-success">✅ Генерация завершена!</span>';
-                        
-                        // Показать галерею
-                        setTimeout(() => {
-                            showTab('gallery');
-                            loadMediaGallery();
-                        }, 2000);
-                    }
-                }, 500);
-            } else {
-                document.getElementById('generateStatus').innerHTML = 
-                    `<span class="text-danger">❌ Ошибка: ${data.error}</span>`;
-            }
-        })
-        .catch(error => {
-            document.getElementById('generateStatus').innerHTML = 
-                `<span class="text-danger">❌ Ошибка сети: ${error}</span>`;
-        });
-    }
-    
-    // Скачивание медиафайла
-    function downloadMedia(mediaId) {
-        if (!mediaId && currentMediaId) {
-            mediaId = currentMediaId;
-        }
-        
-        if (mediaId) {
-            window.open(`/api/media/${mediaId}/download`, '_blank');
-        }
-    }
-    
-    // Инициализация при загрузке страницы
-    document.addEventListener('DOMContentLoaded', function() {
-        loadMediaGallery();
-        
-        // Добавляем обработчик перетаскивания файлов
-        const uploadArea = document.querySelector('.upload-area');
-        uploadArea.addEventListener('dragover', (e) => {
-            e.preventDefault();
-            uploadArea.style.borderColor = '#4361ee';
-            uploadArea.style.backgroundColor = 'rgba(67, 97, 238, 0.1)';
-        });
-        
-        uploadArea.addEventListener('dragleave', () => {
-            uploadArea.style.borderColor = '#dee2e6';
-            uploadArea.style.backgroundColor = '';
-        });
-        
-        uploadArea.addEventListener('drop', (e) => {
-            e.preventDefault();
-            uploadArea.style.borderColor = '#dee2e6';
-            uploadArea.style.backgroundColor = '';
-            
-            if (e.dataTransfer.files.length > 0) {
-                handleFileSelect(e.dataTransfer.files);
-            }
-        });
-    });
-    </script>
-</body>
-</html>
-'''
+# HTML-интерфейс вынесен в static/index.html и читается один раз при старте
+INDEX_HTML = (BASE_DIR / 'static' / 'index.html').read_bytes()
+INDEX_ETAG = hashlib.md5(INDEX_HTML).hexdigest()
+# Сжатая копия готовится один раз при старте — не жмём на каждый запрос
+INDEX_HTML_GZ = gzip.compress(INDEX_HTML, 9)
 
 # ==================== API ЭНДПОИНТЫ ====================
 
 @app.route('/')
 def index():
     """Главная страница"""
-    return HTML_TEMPLATE
+    if INDEX_ETAG in request.if_none_match:
+        return '', 304
+    headers = {'ETag': INDEX_ETAG,
+               # stale-while-revalidate: клиент показывает устаревшую копию,
+               # пока в фоне перепроверяет ETag
+               'Cache-Control': 'public, max-age=300, stale-while-revalidate=3600',
+               'Vary': 'Accept-Encoding'}
+    if 'gzip' in request.headers.get('Accept-Encoding', ''):
+        headers['Content-Encoding'] = 'gzip'
+        return Response(INDEX_HTML_GZ, mimetype='text/html', headers=headers)
+    return Response(INDEX_HTML, mimetype='text/html', headers=headers)
+
+@lru_cache(maxsize=512)
+def _rendered_media(media_id, version):
+    """Сериализованный элемент; версия в ключе — старые записи отмирают сами"""
+    item = db.get_media(media_id)
+    return json_dumps_bytes(item) if item else None
+
+def ojsonify(obj):
+    """jsonify без стандартного кодировщика — сразу байты через orjson"""
+    return app.response_class(json_dumps_bytes(obj), mimetype='application/json')
+
+def _db_etag():
+    """ETag по номеру версии базы — дёшево и меняется на каждой мутации"""
+    return f"{db.etag_seed}.{db.version}"
 
 @app.route('/api/media')
 def get_all_media():
     """Получение всех медиафайлов"""
-    media = db.get_all_media()
-    return jsonify(media)
+    etag = _db_etag()
+    if request.if_none_match.contains_weak(etag):
+        return '', 304
+    media_type = request.args.get('type')
+    limit = request.args.get('limit', type=int)
+    if media_type is None and limit is None:
+        # Горячий путь: отдаём заранее сериализованные байты;
+        # direct_passthrough — без прохода через итератор ответа Flask
+        body = db.get_all_bytes()
+        headers = {'Vary': 'Accept-Encoding'}
+        # JSON с повторяющимися ключами жмётся в разы; сжатая копия кешируется
+        if len(body) > 500 and 'gzip' in request.headers.get('Accept-Encoding', ''):
+            body = db.get_all_bytes_gz()
+            headers['Content-Encoding'] = 'gzip'
+        resp = Response(body, mimetype='application/json', headers=headers,
+                        direct_passthrough=True)
+    else:
+        resp = ojsonify(db.get_list_view(media_type, limit))
+    resp.set_etag(etag, weak=True)
+    return resp
 
 @app.route('/api/media/<int:media_id>')
 def get_media_by_id(media_id):
     """Получение конкретного медиафайла"""
-    media = db.get_media(media_id)
-    if media:
-        return jsonify(media)
+    body = _rendered_media(media_id, db.version)
+    if body is not None:
+        return app.response_class(body, mimetype='application/json')
     return jsonify({'error': 'Медиафайл не найден'}), 404
 
+@app.route('/api/media.ndjson')
+def get_all_media_ndjson():
+    """Потоковая выдача медиатеки: по одному JSON-объекту на строку"""
+    items = list(db.get_all_media())
+
+    def generate():
+        for item in items:
+            yield json_dumps_bytes(item) + b'\n'
+
+    return Response(stream_with_context(generate()),
+                    mimetype='application/x-ndjson')
+
+@app.route('/api/media/stats')
+def media_stats():
+    """Статистика медиатеки из готовых счётчиков"""
+    etag = _db_etag()
+    if request.if_none_match.contains_weak(etag):
+        return '', 304
+    resp = ojsonify(db.get_stats())
+    resp.set_etag(etag, weak=True)
+    return resp
+
 @app.route('/api/media/search')
 def search_media():
     """Поиск медиафайлов"""
+    etag = _db_etag()
+    if request.if_none_match.contains_weak(etag):
+        return '', 304
     query = request.args.get('q', '')
-    results = db.search_media(query)
-    return jsonify(results)
+    # Ответ склеивается из тех же закодированных фрагментов, что и галерея
+    resp = Response(db.search_bytes(query), mimetype='application/json',
+                    direct_passthrough=True)
+    resp.set_etag(etag, weak=True)
+    return resp
+
+@app.route('/static/thumbnails/<path:fn>')
+def thumbnail_file(fn):
+    """Миниатюры с условными ответами: повторные загрузки — 304"""
+    return send_from_directory(THUMB_DIR, fn,
+                               conditional=True, max_age=60 * 60 * 24 * 30)
+
+def _save_upload(file, filename):
+    """Потоковое сохранение загрузки: во временный файл, затем атомарный rename
+
+    При совпадении имён файл не перезаписывается — имя дополняется
+    числовым суффиксом. Имя занимается через O_EXCL, поэтому две
+    одновременные загрузки одного имени не столкнутся. Возвращает
+    фактическое имя файла.
+    """
+    # Уникальный временный файл на каждую загрузку — параллельные записи
+    # одного имени не перемешиваются в общем .part
+    fd, tmp_path = tempfile.mkstemp(dir=UPLOAD_DIR, suffix='.part')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            shutil.copyfileobj(file.stream, f, 1 << 20)
+        stem, dot, ext = filename.rpartition('.')
+        candidate = filename
+        n = 1
+        while True:
+            filepath = os.path.join(UPLOAD_DIR, candidate)
+            try:
+                # Атомарное занятие имени: создание либо наше, либо ничьё
+                os.close(os.open(filepath, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            except FileExistsError:
+                candidate = f"{stem}_{n}.{ext}" if dot else f"{filename}_{n}"
+                n += 1
+                continue
+            # Обрыв загрузки оставит только .part — файл появляется целиком
+            os.replace(tmp_path, filepath)
+            return candidate
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
 
 @app.route('/api/media/upload', methods=['POST'])
 def upload_media():
@@ -926,9 +652,9 @@ def upload_media():
         # Безопасное имя файла
         filename = secure_filename(file.filename)
         
-        # Сохраняем файл
-        filepath = BASE_DIR / 'data' / 'uploads' / filename
-        file.save(filepath)
+        # Сохраняем файл потоково, мегабайтными блоками —
+        # пиковая память не зависит от размера загрузки
+        filename = _save_upload(file, filename)
         
         # Добавляем в базу данных
         description = request.form.get('description', '')
@@ -945,11 +671,48 @@ def upload_media():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/media/upload_batch', methods=['POST'])
+def upload_media_batch():
+    """Пакетная загрузка: один запрос и одна вставка в базу на всю пачку"""
+    try:
+        files = request.files.getlist('files')
+        if not files:
+            return jsonify({'error': 'Файлы не найдены'}), 400
+
+        description = request.form.get('description', '')
+        media_type = request.form.get('media_type', 'generated')
+
+        entries = []
+        for file in files:
+            if not file.filename:
+                continue
+            filename = _save_upload(file, secure_filename(file.filename))
+            entries.append((filename, media_type, description))
+
+        if not entries:
+            return jsonify({'error': 'Файл не выбран'}), 400
+
+        added = db.add_media_many(entries)
+
+        return jsonify({
+            'success': True,
+            'media': added,
+            'message': f'Загружено {len(added)} файлов'
+        })
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/media/generate', methods=['POST'])
 def generate_media():
     """Генерация медиаконтента"""
     try:
-        data = request.json
+        # Разбираем тело сами через orjson — без обхода через str,
+        # с ограничением размера, чтобы большое тело не раздувало память
+        if request.content_length and request.content_length > 65536:
+            return jsonify({'error': 'Слишком большой запрос'}), 413
+        raw = request.get_data(cache=False)
+        data = json_loads(raw) if raw else {}
         prompt = data.get('prompt', '')
         media_type = data.get('type', 'image')
         count = data.get('count', 4)
@@ -959,8 +722,8 @@ def generate_media():
         
         # В реальном приложении здесь будет вызов AI API
         # Пока создаем тестовые медиафайлы
-        
-        generated_items = []
+
+        entries = []
         for i in range(count):
             if media_type == 'image':
                 filename = f"generated_{int(time.time())}_{i}.jpg"
@@ -968,15 +731,21 @@ def generate_media():
             else:
                 filename = f"generated_{int(time.time())}_{i}.mp4"
                 description = f"Сгенерированное видео: {prompt}"
-            
-            # Добавляем в базу данных
-            media_item = db.add_media(filename, 'generated', description)
-            generated_items.append(media_item)
-            
-            # Создаем тестовый файл (заглушку)
-            test_file = BASE_DIR / 'data' / 'uploads' / filename
-            with open(test_file, 'w') as f:
-                f.write(f"Test {media_type} file - {prompt}")
+            entries.append((filename, 'generated', description))
+
+        # Одна пакетная вставка вместо count отдельных записей в базу
+        generated_items = db.add_media_many(entries)
+
+        # Заглушки пишем параллельно через общий пул
+        stub_content = (f"Test {media_type} file - {prompt}").encode('utf-8')
+        stub_paths = [os.path.join(UPLOAD_DIR, item['filename'])
+                      for item in generated_items]
+
+        def write_stub(path):
+            with open(path, 'wb') as f:
+                f.write(stub_content)
+
+        list(MEDIA_EXECUTOR.map(write_stub, stub_paths))
         
         return jsonify({
             'success': True,
@@ -994,12 +763,21 @@ def download_media(media_id):
     if not media:
         return jsonify({'error': 'Файл не найден'}), 404
     
-    filepath = BASE_DIR / 'data' / 'uploads' / media['filename']
-    if not filepath.exists():
+    filepath = os.path.join(UPLOAD_DIR, media['filename'])
+    if not os.path.exists(filepath):
         return jsonify({'error': 'Файл не существует на сервере'}), 404
-    
+
+    if USE_X_ACCEL:
+        # Тело отдаст nginx через sendfile — воркер не гоняет байты
+        mime = mimetypes.guess_type(media['filename'])[0] or 'application/octet-stream'
+        return Response('', headers={
+            'X-Accel-Redirect': f"/internal_uploads/{media['filename']}",
+            'Content-Type': mime,
+            'Content-Disposition': f"attachment; filename={media['filename']}"
+        })
+
     return send_from_directory(
-        BASE_DIR / 'data' / 'uploads',
+        UPLOAD_DIR,
         media['filename'],
         as_attachment=True,
         download_name=media['filename']
@@ -1008,18 +786,25 @@ def download_media(media_id):
 @app.route('/static/<path:filename>')
 def serve_static(filename):
     """Сервис статических файлов"""
-    return send_from_directory(BASE_DIR / 'static', filename)
+    return send_from_directory(STATIC_DIR, filename)
 
 @app.route('/data/uploads/<path:filename>')
 def serve_upload(filename):
     """Сервис загруженных файлов"""
-    return send_from_directory(BASE_DIR / 'data' / 'uploads', filename)
+    if USE_X_ACCEL:
+        mime = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        return Response('', headers={
+            'X-Accel-Redirect': f"/internal_uploads/{filename}",
+            'Content-Type': mime
+        })
+    # conditional=True включает Range-запросы — видео можно перематывать
+    return send_from_directory(UPLOAD_DIR, filename, conditional=True)
 
 # ==================== ЗАПУСК СЕРВЕРА ====================
 
 if __name__ == '__main__':
     # Добавляем тестовые данные
-    if len(db.get_all_media()) == 0:
+    if not db.media["media"]:
         test_media = [
             ("example1.jpg", "reference", "Пример пейзажа с горами"),
             ("example2.jpg", "reference", "Пример портрета с хорошим освещением"),
@@ -1028,17 +813,17 @@ if __name__ == '__main__':
             ("upscaled1.jpg", "upscaled", "Апскейлированное изображение 4K"),
             ("final_video.mp4", "final", "Финальный ролик для публикации")
         ]
-        
-        for filename, media_type, description in test_media:
-            db.add_media(filename, media_type, description)
+
+        # Одна пакетная вставка вместо шести отдельных
+        db.add_media_many(test_media)
     
     print("=" * 60)
     print("🎬 MEDIA AUTOMATION SYSTEM - ПРОСМОТР МЕДИА")
     print("=" * 60)
     print("📁 Папки созданы:")
-    print(f"  • Загрузки: {BASE_DIR / 'data' / 'uploads'}")
-    print(f"  • Статика: {BASE_DIR / 'static'}")
-    print(f"  • Миниатюры: {BASE_DIR / 'static' / 'thumbnails'}")
+    print(f"  • Загрузки: {UPLOAD_DIR}")
+    print(f"  • Статика: {STATIC_DIR}")
+    print(f"  • Миниатюры: {THUMB_DIR}")
     print("")
     print("🌐 Запуск:")
     print("  1. Установите Flask: pip install flask")
@@ -1052,4 +837,4 @@ if __name__ == '__main__':
     print("  • Поиск по медиатеке")
     print("=" * 60)
     
-    app.run(host='0.0.0.0', port=8000, debug=True)
+    app.run(host='0.0.0.0', port=8000, debug=True, threaded=True)
@@ -0,0 +1,17 @@
+"""Конфигурация Gunicorn для продакшена (запуск за Nginx)
+
+gunicorn -c gunicorn.conf.py app:app
+"""
+
+bind = "127.0.0.1:8000"
+# Строго один процесс-воркер: MediaDatabase живёт в памяти процесса,
+# несколько воркеров выдавали бы дублирующиеся id и затирали журнал
+# друг друга при перезаписи снимка. Конкурентность дают потоки gthread.
+workers = 1
+# gthread вместо sync: файловый ввод-вывод в обработчиках не блокирует
+# целый воркер. preload_app не включаем: база и её фоновый флашер
+# создаются при импорте, а потоки и atexit-хуки не переживают fork() —
+# приложение должно импортироваться уже в воркере.
+worker_class = "gthread"
+threads = 5
+timeout = 120
@@ -0,0 +1,404 @@
+// Глобальные переменные
+let selectedFiles = [];
+let currentMediaId = null;
+
+// Функции для вкладок
+function showTab(tabName) {
+    // Скрыть все вкладки
+    document.getElementById('galleryTab').style.display = 'none';
+    document.getElementById('uploadTab').style.display = 'none';
+    document.getElementById('generateTab').style.display = 'none';
+    
+    // Показать выбранную вкладку
+    document.getElementById(tabName + 'Tab').style.display = 'block';
+    
+    // Обновить активный таб в навигации
+    document.querySelectorAll('.nav-tabs .nav-link').forEach(link => {
+        link.classList.remove('active');
+    });
+    event.target.classList.add('active');
+    
+    // Если это галерея - загрузить медиа
+    if (tabName === 'gallery') {
+        loadMediaGallery();
+    }
+}
+
+// Загрузка галереи медиа
+function loadMediaGallery() {
+    fetch('/api/media')
+        .then(response => response.json())
+        .then(media => {
+            updateMediaCount(media.length);
+            renderMediaGallery(media);
+        })
+        .catch(error => {
+            console.error('Ошибка загрузки медиа:', error);
+            document.getElementById('mediaGallery').innerHTML = 
+                '<div class="col-12 text-center"><p class="text-danger">Ошибка загрузки медиа</p></div>';
+        });
+}
+
+// Обновление счетчика медиа
+function updateMediaCount(count) {
+    document.getElementById('mediaCount').textContent = count;
+}
+
+// Отрисовка галереи
+function renderMediaGallery(media) {
+    const container = document.getElementById('mediaGallery');
+    
+    if (!media || media.length === 0) {
+        container.innerHTML = `
+            <div class="col-12 text-center py-5">
+                <i class="fas fa-inbox fa-3x text-muted mb-3"></i>
+                <h4 class="text-muted">Медиатека пуста</h4>
+                <p class="text-muted mb-4">Загрузите или сгенерируйте первый файл</p>
+                <button class="btn btn-primary" onclick="showTab('upload')">
+                    <i class="fas fa-upload me-2"></i>Загрузить файлы
+                </button>
+                <button class="btn btn-success ms-2" onclick="showTab('generate')">
+                    <i class="fas fa-magic me-2"></i>Сгенерировать
+                </button>
+            </div>
+        `;
+        return;
+    }
+    
+    let html = '';
+    media.forEach(item => {
+        // Определяем иконку по типу
+        let icon = 'fa-file';
+        let badgeClass = 'bg-secondary';
+        
+        if (item.type === 'image') {
+            icon = 'fa-image';
+            badgeClass = 'bg-success';
+        } else if (item.type === 'video') {
+            icon = 'fa-video';
+            badgeClass = 'bg-primary';
+        }
+        
+        // Определяем цвет бейджа по типу контента
+        let typeBadgeClass = 'bg-info';
+        if (item.media_type === 'reference') typeBadgeClass = 'bg-warning';
+        else if (item.media_type === 'generated') typeBadgeClass = 'bg-success';
+        else if (item.media_type === 'upscaled') typeBadgeClass = 'bg-purple';
+        else if (item.media_type === 'final') typeBadgeClass = 'bg-danger';
+        
+        html += `
+            <div class="col-md-3 mb-4">
+                <div class="card media-card" data-media-id="${item.id}">
+                    <!-- Миниатюра -->
+                    <div class="media-thumbnail position-relative">
+                        ${item.thumbnail ? 
+                            `<img src="${item.thumbnail}" class="w-100 h-100" style="object-fit: cover;" loading="lazy" decoding="async">` :
+                            `<i class="fas ${icon} media-icon"></i>`
+                        }
+                        
+                        <!-- Бейдж типа -->
+                        <span class="badge ${typeBadgeClass} media-badge">
+                            ${item.media_type === 'reference' ? 'Пример' : 
+                              item.media_type === 'generated' ? 'Сген.' :
+                              item.media_type === 'upscaled' ? 'Апск.' : 'Финальный'}
+                        </span>
+                        
+                        <!-- Действия -->
+                        <div class="media-actions">
+                            <button class="btn btn-sm btn-light" onclick="viewMedia(${item.id})" title="Просмотр">
+                                <i class="fas fa-eye"></i>
+                            </button>
+                            <button class="btn btn-sm btn-light ms-1" onclick="downloadMedia(${item.id})" title="Скачать">
+                                <i class="fas fa-download"></i>
+                            </button>
+                        </div>
+                    </div>
+                    
+                    <!-- Информация -->
+                    <div class="card-body">
+                        <h6 class="card-title text-truncate" title="${item.filename}">
+                            <i class="fas ${icon} me-2 text-${item.type === 'image' ? 'success' : 'primary'}"></i>
+                            ${item.filename}
+                        </h6>
+                        <p class="card-text small text-muted mb-2">
+                            ${item.description || 'Без описания'}
+                        </p>
+                        <div class="d-flex justify-content-between align-items-center">
+                            <small class="text-muted">
+                                ${item.size || '1920x1080'}
+                            </small>
+                            <small class="text-muted">
+                                ${new Date(item.created_at).toLocaleDateString('ru-RU')}
+                            </small>
+                        </div>
+                    </div>
+                </div>
+            </div>
+        `;
+    });
+    
+    container.innerHTML = html;
+}
+
+// Просмотр медиафайла
+function viewMedia(mediaId) {
+    currentMediaId = mediaId;
+    
+    fetch(`/api/media/${mediaId}`)
+        .then(response => response.json())
+        .then(media => {
+            const modal = new bootstrap.Modal(document.getElementById('mediaModal'));
+            const container = document.getElementById('mediaPreviewContainer');
+            
+            document.getElementById('mediaModalTitle').textContent = media.filename;
+            
+            if (media.type === 'image') {
+                // Для изображений
+                container.innerHTML = `
+                    <img src="${media.path}" class="media-preview" alt="${media.filename}">
+                    <div class="mt-3">
+                        <p class="mb-2"><strong>Описание:</strong> ${media.description || 'Нет описания'}</p>
+                        <p class="mb-2"><strong>Размер:</strong> ${media.size || 'Неизвестно'}</p>
+                        <p class="mb-0"><strong>Тип:</strong> ${media.media_type === 'reference' ? 'Пример' : 'Сгенерированное'}</p>
+                    </div>
+                `;
+            } else if (media.type === 'video') {
+                // Для видео
+                container.innerHTML = `
+                    <video controls class="media-preview">
+                        <source src="${media.path}" type="video/mp4">
+                        Ваш браузер не поддерживает видео.
+                    </video>
+                    <div class="mt-3">
+                        <p class="mb-2"><strong>Описание:</strong> ${media.description || 'Нет описания'}</p>
+                        <p class="mb-2"><strong>Размер:</strong> ${media.size || 'Неизвестно'}</p>
+                        <p class="mb-0"><strong>Тип:</strong> ${media.media_type === 'reference' ? 'Пример' : 'Сгенерированное'}</p>
+                    </div>
+                `;
+            }
+            
+            modal.show();
+        })
+        .catch(error => {
+            alert('Ошибка загрузки медиафайла: ' + error);
+        });
+}
+
+// Поиск медиа
+function searchMedia() {
+    const query = document.getElementById('searchMedia').value;
+    if (!query.trim()) {
+        loadMediaGallery();
+        return;
+    }
+    
+    fetch(`/api/media/search?q=${encodeURIComponent(query)}`)
+        .then(response => response.json())
+        .then(media => {
+            renderMediaGallery(media);
+        });
+}
+
+// Обработка выбора файлов
+function handleFileSelect(files) {
+    selectedFiles = Array.from(files);
+    const container = document.getElementById('selectedFiles');
+    container.innerHTML = '';
+
+    if (selectedFiles.length === 0) {
+        return;
+    }
+
+    // Инкрементальный DOM: узел на файл создаётся один раз, удаление
+    // убирает только его — без пересборки всего списка на каждый клик
+    const header = document.createElement('h5');
+    header.textContent = 'Выбранные файлы:';
+    const list = document.createElement('div');
+    list.className = 'list-group';
+    container.append(header, list);
+    selectedFiles.forEach(file => list.appendChild(createFileItem(file)));
+}
+
+// Элемент списка для одного выбранного файла
+function createFileItem(file) {
+    const item = document.createElement('div');
+    item.className = 'list-group-item';
+    const icon = file.type.startsWith('image') ? 'fa-image text-success' : 
+                 file.type.startsWith('video') ? 'fa-video text-primary' : 'fa-file';
+    item.innerHTML = `
+        <div class="d-flex justify-content-between align-items-center">
+            <div>
+                <i class="fas ${icon} me-2"></i>
+                ${file.name} (${(file.size / 1024 / 1024).toFixed(2)} MB)
+            </div>
+            <button class="btn btn-sm btn-danger">
+                <i class="fas fa-times"></i>
+            </button>
+        </div>
+    `;
+    item.querySelector('button').addEventListener('click', () => removeFile(file, item));
+    return item;
+}
+
+// Удаление файла из списка
+function removeFile(file, item) {
+    selectedFiles.splice(selectedFiles.indexOf(file), 1);
+    item.remove();
+    if (selectedFiles.length === 0) {
+        document.getElementById('selectedFiles').innerHTML = '';
+    }
+}
+
+// Загрузка файлов на сервер
+function uploadFiles() {
+    if (selectedFiles.length === 0) {
+        alert('Выберите файлы для загрузки');
+        return;
+    }
+    
+    const description = document.getElementById('fileDescription').value;
+    const mediaType = document.getElementById('mediaType').value;
+    
+    document.getElementById('uploadProgress').style.display = 'block';
+    document.getElementById('uploadStatus').textContent = 'Начинаю загрузку...';
+    
+    // Все файлы уходят одним multipart-запросом на пакетный эндпоинт —
+    // без накладных расходов отдельного HTTP-запроса на каждый файл
+    const formData = new FormData();
+    selectedFiles.forEach(file => formData.append('files', file));
+    formData.append('description', description);
+    formData.append('media_type', mediaType);
+
+    fetch('/api/media/upload_batch', {
+        method: 'POST',
+        body: formData
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (!data.success) {
+            throw new Error(data.error || 'Ошибка загрузки');
+        }
+
+        document.querySelector('#uploadProgress .progress-bar').style.width = '100%';
+        document.getElementById('uploadStatus').innerHTML = 
+            '<span class="text-success">✅ Все файлы загружены!</span>';
+
+        // Очистить форму
+        selectedFiles = [];
+        document.getElementById('selectedFiles').innerHTML = '';
+        document.getElementById('fileDescription').value = '';
+
+        // Показать галерею
+        setTimeout(() => {
+            showTab('gallery');
+        }, 2000);
+    })
+    .catch(error => {
+        console.error('Ошибка загрузки:', error);
+        document.getElementById('uploadStatus').innerHTML = 
+            '<span class="text-danger">❌ Ошибка загрузки файлов</span>';
+    });
+}
+
+// Генерация контента
+function generateContent() {
+    const prompt = document.getElementById('generatePrompt').value;
+    const type = document.getElementById('generateType').value;
+    const count = document.getElementById('generateCount').value;
+    
+    if (!prompt.trim()) {
+        alert('Введите описание для генерации');
+        return;
+    }
+    
+    document.getElementById('generateProgress').style.display = 'block';
+    document.getElementById('generateStatus').textContent = 'Начинаю генерацию...';
+    
+    fetch('/api/media/generate', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({
+            prompt: prompt,
+            type: type,
+            count: parseInt(count)
+        })
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            // Генерация синхронная: ответ уже содержит результат,
+            // таймер с поддельным прогрессом не нужен
+            document.querySelector('#generateProgress .progress-bar').style.width = '100%';
+            document.getElementById('generateStatus').innerHTML = 
+                '<span class="text-success">✅ Генерация завершена!</span>';
+
+            // Показать галерею
+            setTimeout(() => {
+                showTab('gallery');
+                loadMediaGallery();
+            }, 1000);
+        } else {
+            document.getElementById('generateStatus').innerHTML = 
+                `<span class="text-danger">❌ Ошибка: ${data.error}</span>`;
+        }
+    })
+    .catch(error => {
+        document.getElementById('generateStatus').innerHTML = 
+            `<span class="text-danger">❌ Ошибка сети: ${error}</span>`;
+    });
+}
+
+// Скачивание медиафайла
+function downloadMedia(mediaId) {
+    if (!mediaId && currentMediaId) {
+        mediaId = currentMediaId;
+    }
+    
+    if (mediaId) {
+        // Скачивание по текущему соединению вместо открытия новой вкладки
+        fetch(`/api/media/${mediaId}/download`)
+            .then(response => {
+                if (!response.ok) throw new Error(`HTTP ${response.status}`);
+                const disposition = response.headers.get('Content-Disposition') || '';
+                const match = disposition.match(/filename="?([^";]+)/);
+                return response.blob().then(blob => ({blob, name: match ? match[1] : `media_${mediaId}`}));
+            })
+            .then(({blob, name}) => {
+                const url = URL.createObjectURL(blob);
+                const a = document.createElement('a');
+                a.href = url;
+                a.download = name;
+                a.click();
+                URL.revokeObjectURL(url);
+            })
+            .catch(error => console.error('Ошибка скачивания:', error));
+    }
+}
+
+// Инициализация при загрузке страницы
+document.addEventListener('DOMContentLoaded', function() {
+    loadMediaGallery();
+    
+    // Добавляем обработчик перетаскивания файлов
+    const uploadArea = document.querySelector('.upload-area');
+    uploadArea.addEventListener('dragover', (e) => {
+        e.preventDefault();
+        uploadArea.style.borderColor = '#4361ee';
+        uploadArea.style.backgroundColor = 'rgba(67, 97, 238, 0.1)';
+    });
+    
+    uploadArea.addEventListener('dragleave', () => {
+        uploadArea.style.borderColor = '#dee2e6';
+        uploadArea.style.backgroundColor = '';
+    });
+    
+    uploadArea.addEventListener('drop', (e) => {
+        e.preventDefault();
+        uploadArea.style.borderColor = '#dee2e6';
+        uploadArea.style.backgroundColor = '';
+        
+        if (e.dataTransfer.files.length > 0) {
+            handleFileSelect(e.dataTransfer.files);
+        }
+    });
+});